@@ -5,14 +5,19 @@ Built for Africa Blockchain Festival 2025
 """
 
 from fastapi import APIRouter, File, UploadFile, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from pydantic import BaseModel
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
+from datetime import datetime, timezone
+import asyncio
 import logging
-import traceback
 import os
 import tempfile
-import shutil
+import aiofiles
+import orjson
+from contextlib import asynccontextmanager
+from cachetools import TTLCache
 
 # Configure logging first
 logging.basicConfig(level=logging.INFO)
@@ -31,15 +36,124 @@ except Exception as e:
 
 # Import prediction functions
 try:
-    from scripts.predict_plantdoc import predict_disease
+    from scripts.predict_plantdoc import predict_disease, warmup_model as warmup_disease_model
     from scripts.predict_with_graph import get_price_predictions
-    from scripts.predict_soil import predict_soil_type
-    from scripts.predict_weather import get_weather_forecast
+    from scripts.predict_soil import predict_soil_type, warmup_soil_model
+    from scripts.predict_weather import (
+        get_weather_forecast_async,
+        create_async_session as create_weather_session
+    )
 except ImportError as e:
     logger.warning(f"Could not import prediction modules: {e}")
 
 router = APIRouter(prefix="/api/ai", tags=["AI Oracles"])
 
+# Uploads are streamed to disk in 1 MiB chunks so the event loop stays free
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+@asynccontextmanager
+async def _temp_upload(file: UploadFile):
+    """Stream an uploaded image to a temporary .jpg file that is removed on exit"""
+    fd, temp_path = tempfile.mkstemp(suffix=".jpg")
+    os.close(fd)
+    try:
+        async with aiofiles.open(temp_path, 'wb') as f:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                await f.write(chunk)
+        yield temp_path
+    finally:
+        try:
+            os.unlink(temp_path)
+        except FileNotFoundError:
+            pass
+
+# Set PRELOAD_MODELS=false on workers that only serve market/weather traffic;
+# TensorFlow is then imported on the first image request instead of at startup
+PRELOAD_MODELS = os.getenv("PRELOAD_MODELS", "true").lower() not in ("0", "false", "no")
+
+@router.on_event("startup")
+async def warmup_oracle_models():
+    """Load and warm the soil and disease models so the first request is fast"""
+    if not PRELOAD_MODELS:
+        logger.info("⏭️ PRELOAD_MODELS disabled, models will load on first use")
+        return
+    
+    try:
+        if await run_in_threadpool(warmup_soil_model):
+            logger.info("✅ Soil model warmed up")
+        else:
+            logger.warning("⚠️ Soil model not available, skipping warmup")
+    except Exception as e:
+        logger.warning(f"⚠️ Could not warm up soil model: {e}")
+    
+    try:
+        if await run_in_threadpool(warmup_disease_model):
+            logger.info("✅ Disease model warmed up")
+        else:
+            logger.warning("⚠️ Disease model not available, skipping warmup")
+    except Exception as e:
+        logger.warning(f"⚠️ Could not warm up disease model: {e}")
+
+# Price predictions change daily, so they are memoized per date. Each missing
+# key runs as one shared task, so concurrent or timed-out callers never start
+# a second upstream computation. (Weather forecasts are cached inside
+# scripts.predict_weather.)
+PRICE_CACHE_TTL = 3600
+_PRICE_CACHE = TTLCache(maxsize=8, ttl=PRICE_CACHE_TTL)
+_CACHE_TASKS: Dict[Any, asyncio.Task] = {}
+
+# Shared HTTP/2 client for WeatherAPI, opened with the app and closed on shutdown
+_weather_session = None
+
+async def _cached_call(cache: TTLCache, key: Any, func, *args, cacheable=None):
+    """Return cache[key], computing it once in the threadpool on a miss"""
+    value = cache.get(key)
+    if value is not None:
+        return value
+    task = _CACHE_TASKS.get(key)
+    if task is None:
+        task = _CACHE_TASKS[key] = asyncio.ensure_future(run_in_threadpool(func, *args))
+        
+        def store(done: asyncio.Task):
+            # Runs even when every waiter timed out, so the work is not wasted
+            _CACHE_TASKS.pop(key, None)
+            if done.cancelled() or done.exception() is not None:
+                return
+            result = done.result()
+            if cacheable is None or cacheable(result):
+                cache[key] = result
+        
+        task.add_done_callback(store)
+    # Shielded so a caller's timeout cancels only its wait, not the shared task
+    return await asyncio.shield(task)
+
+def _has_price_predictions(results: List[Dict[str, Any]]) -> bool:
+    """False when every crop failed, so the error list is not cached for an hour"""
+    return any("error" not in crop for crop in results)
+
+async def cached_price_predictions():
+    """Price predictions, recomputed at most once per day per PRICE_CACHE_TTL"""
+    key = ("prices", datetime.now().date().isoformat())
+    return await _cached_call(_PRICE_CACHE, key, get_price_predictions, cacheable=_has_price_predictions)
+
+@router.on_event("startup")
+async def open_oracle_clients():
+    """Open pooled upstream connections"""
+    global _weather_session
+    try:
+        _weather_session = create_weather_session()
+    except Exception as e:
+        logger.warning(f"⚠️ Could not create weather session: {e}")
+
+@router.on_event("shutdown")
+async def close_oracle_clients():
+    """Release pooled upstream connections"""
+    try:
+        if _weather_session is not None:
+            await _weather_session.aclose()
+    except Exception as e:
+        logger.warning(f"⚠️ Could not close weather session: {e}")
+
 class OracleResponse(BaseModel):
     """Standardized response format for all oracles"""
     oracle_type: str
@@ -72,18 +186,9 @@ async def validate_plant_image(file: UploadFile = File(...)):
         }
     
     try:
-        # Save uploaded file temporarily
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".jpg") as temp_file:
-            shutil.copyfileobj(file.file, temp_file)
-            temp_path = temp_file.name
-        
-        # Validate with Gemini
-        result = await gemini_service.validate_plant_image(temp_path)
-        
-        # Clean up
-        os.unlink(temp_path)
-        
-        return result
+        # Save uploaded file temporarily and validate with Gemini
+        async with _temp_upload(file) as temp_path:
+            return await gemini_service.validate_plant_image(temp_path)
     except Exception as e:
         logger.error(f"Image validation error: {e}")
         return {
@@ -92,182 +197,187 @@ async def validate_plant_image(file: UploadFile = File(...)):
             "message": "Validation failed, proceeding with analysis"
         }
 
+# Static status body, serialized once at import time
+_STATUS_BODY = orjson.dumps({
+    "status": "healthy",
+    "message": "FarmOracle AI System Online",
+    "tagline": "Africa's Autonomous AI Farming Oracle on the Blockchain",
+    "oracles": {
+        "disease_oracle": {
+            "name": "Disease Detection Oracle",
+            "description": "AI-powered crop disease identification",
+            "model": "EfficientNetB4",
+            "accuracy": "94.2%",
+            "status": "active"
+        },
+        "market_oracle": {
+            "name": "Market Price Oracle", 
+            "description": "ML-based crop price predictions",
+            "models": "Random Forest + XGBoost",
+            "forecast_range": "5 weeks",
+            "status": "active"
+        },
+        "soil_oracle": {
+            "name": "Soil Analysis Oracle",
+            "description": "Soil type classification and recommendations", 
+            "model": "Multi-class CNN",
+            "soil_types": 4,
+            "status": "active"
+        },
+        "weather_oracle": {
+            "name": "Weather Forecast Oracle",
+            "description": "Climate prediction for farming",
+            "model": "LSTM Time Series",
+            "forecast_range": "14 days", 
+            "status": "active"
+        }
+    },
+    "hackathon": "Africa Blockchain Festival 2025"
+})
+
 @router.get("/oracle/status")
 async def get_oracle_status():
     """Get status of all AI oracles"""
-    try:
-        return {
-            "status": "healthy",
-            "message": "FarmOracle AI System Online",
-            "tagline": "Africa's Autonomous AI Farming Oracle on the Blockchain",
-            "oracles": {
-                "disease_oracle": {
-                    "name": "Disease Detection Oracle",
-                    "description": "AI-powered crop disease identification",
-                    "model": "EfficientNetB4",
-                    "accuracy": "94.2%",
-                    "status": "active"
-                },
-                "market_oracle": {
-                    "name": "Market Price Oracle", 
-                    "description": "ML-based crop price predictions",
-                    "models": "Random Forest + XGBoost",
-                    "forecast_range": "5 weeks",
-                    "status": "active"
-                },
-                "soil_oracle": {
-                    "name": "Soil Analysis Oracle",
-                    "description": "Soil type classification and recommendations", 
-                    "model": "Multi-class CNN",
-                    "soil_types": 4,
-                    "status": "active"
-                },
-                "weather_oracle": {
-                    "name": "Weather Forecast Oracle",
-                    "description": "Climate prediction for farming",
-                    "model": "LSTM Time Series",
-                    "forecast_range": "14 days", 
-                    "status": "active"
-                }
-            },
-            "hackathon": "Africa Blockchain Festival 2025"
-        }
-    except Exception as e:
-        logger.error(f"Oracle status error: {str(e)}")
-        raise HTTPException(status_code=500, detail="Oracle system error")
+    return Response(content=_STATUS_BODY, media_type="application/json")
 
 @router.post("/oracle/disease")
 async def disease_oracle(file: UploadFile = File(...)):
     """Disease Detection Oracle - Analyze crop images for diseases"""
     try:
-        # Create temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".jpg") as temp_file:
-            shutil.copyfileobj(file.file, temp_file)
-            temp_path = temp_file.name
-
-        # Step 1: Validate if image is a plant/crop
-        if gemini_service and gemini_service.model:
-            validation = await gemini_service.validate_plant_image(temp_path)
+        # Create temporary file, removed when the block exits
+        async with _temp_upload(file) as temp_path:
+            # Step 1: Validate if image is a plant/crop
+            if gemini_service and gemini_service.model:
+                validation = await gemini_service.validate_plant_image(temp_path)
             
-            if not validation.get("is_plant", True):
-                os.unlink(temp_path)
-                return JSONResponse(
-                    status_code=400,
-                    content={
-                        "oracle_type": "disease_detection",
-                        "status": "invalid_image",
-                        "error": "Not a plant image",
-                        "message": "⚠️ Please upload only plant, crop, vegetable, or fruit images",
-                        "suggestion": "Upload a clear photo of leaves, stems, or fruits showing any disease symptoms",
-                        "hackathon": "Africa Blockchain Festival 2025"
-                    }
-                )
+                if not validation.get("is_plant", True):
+                    return JSONResponse(
+                        status_code=400,
+                        content={
+                            "oracle_type": "disease_detection",
+                            "status": "invalid_image",
+                            "error": "Not a plant image",
+                            "message": "⚠️ Please upload only plant, crop, vegetable, or fruit images",
+                            "suggestion": "Upload a clear photo of leaves, stems, or fruits showing any disease symptoms",
+                            "hackathon": "Africa Blockchain Festival 2025"
+                        }
+                    )
 
-        # Step 2: Try ML model first
-        try:
-            result = predict_disease(temp_path)
+            # Step 2: Try ML model first
+            try:
+                result = await run_in_threadpool(predict_disease, temp_path)
             
-            if "error" not in result:
-                # ML model succeeded
-                disease_name = result.get("class", "Unknown")
-                confidence = result.get("confidence", 0.0)
+                if "error" not in result:
+                    # ML model succeeded
+                    disease_name = result.get("class", "Unknown")
+                    confidence = result.get("confidence", 0.0)
                 
-                # Step 3: Generate user-friendly report using Gemini
-                user_report = None
-                if gemini_service and gemini_service.model and confidence > 0.5:
-                    report_result = await gemini_service.generate_user_friendly_report(
-                        disease_name=disease_name,
-                        confidence=confidence,
-                        crop_type=result.get("crop_type", "crop")
-                    )
-                    if report_result["status"] == "success":
-                        user_report = report_result["report"]
-                
-                os.unlink(temp_path)
-                return {
-                    "oracle_type": "disease_detection",
-                    "status": "success",
-                    "prediction": {
-                        "disease": disease_name,
-                        "health_status": result.get("status", "Unknown"),
-                        "treatment_recommended": result.get("status") == "DISEASED",
-                        "user_friendly_report": user_report
-                    },
-                    "confidence": confidence,
-                    "metadata": {
-                        "model": "EfficientNetB4",
-                        "classes_supported": 27,
-                        "image_processed": True,
-                        "source": "ML Model",
-                        "report_generated": user_report is not None
-                    },
-                    "hackathon": "Africa Blockchain Festival 2025"
-                }
-        except Exception as ml_error:
-            logger.warning(f"ML model failed: {ml_error}, falling back to Gemini AI")
-        
-        # Fallback to Gemini AI if ML model fails
-        if gemini_service and gemini_service.model:
-            logger.info("🤖 Using Gemini AI as fallback for disease detection")
-            try:
-                gemini_result = await gemini_service.analyze_crop_image(temp_path, "crop")
+                    # Step 3: Generate user-friendly report using Gemini
+                    user_report = None
+                    if gemini_service and gemini_service.model and confidence > 0.5:
+                        report_result = await gemini_service.generate_user_friendly_report(
+                            disease_name=disease_name,
+                            confidence=confidence,
+                            crop_type=result.get("crop_type", "crop")
+                        )
+                        if report_result["status"] == "success":
+                            user_report = report_result["report"]
                 
-                if gemini_result["status"] == "success":
                     return {
                         "oracle_type": "disease_detection",
                         "status": "success",
                         "prediction": {
-                            "disease": "AI Analysis",
-                            "health_status": "Analyzed by Gemini AI",
-                            "analysis": gemini_result["analysis"],
-                            "treatment_recommended": True
+                            "disease": disease_name,
+                            "health_status": result.get("status", "Unknown"),
+                            "treatment_recommended": result.get("status") == "DISEASED",
+                            "user_friendly_report": user_report
                         },
-                        "confidence": 0.85,
+                        "confidence": confidence,
                         "metadata": {
-                            "model": "Gemini Pro Vision",
-                            "source": "Gemini AI Fallback",
-                            "image_processed": True
+                            "model": "EfficientNetB4",
+                            "classes_supported": 27,
+                            "image_processed": True,
+                            "source": "ML Model",
+                            "report_generated": user_report is not None
                         },
                         "hackathon": "Africa Blockchain Festival 2025"
                     }
-            except Exception as gemini_error:
-                logger.error(f"Gemini fallback error: {gemini_error}")
-            finally:
-                # Clean up temp file
+            except Exception as ml_error:
+                logger.warning(f"ML model failed: {ml_error}, falling back to Gemini AI")
+        
+            # Fallback to Gemini AI if ML model fails
+            if gemini_service and gemini_service.model:
+                logger.info("🤖 Using Gemini AI as fallback for disease detection")
                 try:
-                    os.unlink(temp_path)
-                except:
-                    pass
-        else:
-            # Clean up if Gemini not available
-            try:
-                os.unlink(temp_path)
-            except:
-                pass
+                    gemini_result = await gemini_service.analyze_crop_image(temp_path, "crop")
+                
+                    if gemini_result["status"] == "success":
+                        return {
+                            "oracle_type": "disease_detection",
+                            "status": "success",
+                            "prediction": {
+                                "disease": "AI Analysis",
+                                "health_status": "Analyzed by Gemini AI",
+                                "analysis": gemini_result["analysis"],
+                                "treatment_recommended": True
+                            },
+                            "confidence": 0.85,
+                            "metadata": {
+                                "model": "Gemini Pro Vision",
+                                "source": "Gemini AI Fallback",
+                                "image_processed": True
+                            },
+                            "hackathon": "Africa Blockchain Festival 2025"
+                        }
+                except Exception as gemini_error:
+                    logger.error(f"Gemini fallback error: {gemini_error}")
         
-        # If both fail, return error
-        return JSONResponse(
-            status_code=503,
-            content={
-                "oracle_type": "disease_detection",
-                "status": "error",
-                "error": "Both ML model and Gemini AI unavailable",
-                "hackathon": "Africa Blockchain Festival 2025"
-            }
-        )
+            # If both fail, return error
+            return JSONResponse(
+                status_code=503,
+                content={
+                    "oracle_type": "disease_detection",
+                    "status": "error",
+                    "error": "Both ML model and Gemini AI unavailable",
+                    "hackathon": "Africa Blockchain Festival 2025"
+                }
+            )
         
     except Exception as e:
-        logger.error(f"Disease oracle error: {str(e)}")
-        logger.error(traceback.format_exc())
+        logger.exception("Disease oracle error")
         raise HTTPException(status_code=500, detail=f"Disease oracle failed: {str(e)}")
 
+@router.get("/oracle/disease/report/stream")
+async def disease_report_stream(disease_name: str):
+    """Stream the Gemini disease report as it is generated"""
+    if not gemini_service or not gemini_service.model:
+        raise HTTPException(status_code=503, detail="Gemini AI not configured")
+    
+    # Pull the first chunk up front so a failed Gemini call (quota, bad key)
+    # becomes a 503 instead of an empty 200
+    stream = gemini_service.stream_user_friendly_report(disease_name)
+    try:
+        first = await stream.__anext__()
+    except StopAsyncIteration:
+        first = ""
+    except Exception as e:
+        logger.exception("Disease report stream error")
+        raise HTTPException(status_code=503, detail=f"Gemini report unavailable: {str(e)}")
+    
+    async def body():
+        yield first
+        async for chunk in stream:
+            yield chunk
+    
+    return StreamingResponse(body(), media_type="text/plain; charset=utf-8")
+
 @router.get("/oracle/market")
 async def market_oracle(crop_type: str = "General", current_price: float = 0.0):
     """Market Price Oracle - Get crop price predictions"""
     try:
         # Try ML model first
         try:
-            predictions = get_price_predictions()
+            predictions = await cached_price_predictions()
             
             return {
                 "oracle_type": "market_prediction",
@@ -329,27 +439,22 @@ async def market_oracle(crop_type: str = "General", current_price: float = 0.0):
         }
         
     except Exception as e:
-        logger.error(f"Market oracle error: {str(e)}")
-        logger.error(traceback.format_exc())
+        logger.exception("Market oracle error")
         raise HTTPException(status_code=500, detail=f"Market oracle failed: {str(e)}")
 
 @router.post("/oracle/soil")
 async def soil_oracle(file: UploadFile = File(...)):
     """Soil Analysis Oracle - Analyze soil images"""
     try:
-        # Create temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".jpg") as temp_file:
-            shutil.copyfileobj(file.file, temp_file)
-            temp_path = temp_file.name
+        # Soil photos fit comfortably in memory, so decode straight from the upload bytes
+        image_bytes = await file.read()
         
         # Try ML model first
         try:
             # Attempt to use soil prediction model
-            soil_result = predict_soil_type(temp_path)
+            soil_result = await run_in_threadpool(predict_soil_type, image_bytes)
             
             if soil_result and isinstance(soil_result, dict):
-                os.unlink(temp_path)
-                
                 return {
                     "oracle_type": "soil_analysis",
                     "status": "success",
@@ -379,8 +484,10 @@ async def soil_oracle(file: UploadFile = File(...)):
         # Fallback to Gemini AI
         if gemini_service and gemini_service.model:
             logger.info("🤖 Using Gemini AI as fallback for soil analysis")
-            gemini_result = await gemini_service.analyze_crop_image(temp_path, "soil")
-            os.unlink(temp_path)
+            # Gemini needs a file on disk; only the fallback pays for the temp file
+            await file.seek(0)
+            async with _temp_upload(file) as temp_path:
+                gemini_result = await gemini_service.analyze_crop_image(temp_path, "soil")
             
             if gemini_result["status"] == "success":
                 return {
@@ -401,7 +508,6 @@ async def soil_oracle(file: UploadFile = File(...)):
                 }
         
         # If both fail
-        os.unlink(temp_path)
         return JSONResponse(
             status_code=503,
             content={
@@ -413,8 +519,7 @@ async def soil_oracle(file: UploadFile = File(...)):
         )
         
     except Exception as e:
-        logger.error(f"Soil oracle error: {str(e)}")
-        logger.error(traceback.format_exc())
+        logger.exception("Soil oracle error")
         raise HTTPException(status_code=500, detail=f"Soil oracle failed: {str(e)}")
 
 @router.get("/oracle/weather")
@@ -422,10 +527,11 @@ async def weather_oracle(location: Optional[str] = "auto:ip"):
     """Weather Forecast Oracle - Get REAL weather predictions from WeatherAPI"""
     try:
         # Fetch real weather data
-        weather_data = get_weather_forecast(location)
+        weather_data = await get_weather_forecast_async(location, session=_weather_session)
         
         if weather_data["status"] == "error":
-            raise HTTPException(status_code=500, detail=weather_data["message"])
+            # Invalid input is the client's error; upstream failures stay 500
+            raise HTTPException(status_code=weather_data.get("status_code", 500), detail=weather_data["message"])
         
         return {
             "oracle_type": "weather_forecast",
@@ -441,15 +547,73 @@ async def weather_oracle(location: Optional[str] = "auto:ip"):
             "hackathon": "Africa Blockchain Festival 2025"
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Weather oracle error: {str(e)}")
-        logger.error(traceback.format_exc())
+        logger.exception("Weather oracle error")
         raise HTTPException(status_code=500, detail=f"Weather oracle failed: {str(e)}")
 
+# Per-oracle budget for the insights fan-out so one hung upstream cannot stall it
+INSIGHTS_ORACLE_TIMEOUT = 3.0
+RAIN_ALERT_THRESHOLD = 60
+
+def _market_opportunities(market: Dict[str, Any]) -> List[str]:
+    """Summarize predicted price moves from a market oracle response"""
+    opportunities = []
+    for crop in market.get("prediction", {}).get("crops") or []:
+        predictions = crop.get("predictions") or []
+        if len(predictions) < 2 or not predictions[0]["price"]:
+            continue
+        first, last = predictions[0]["price"], predictions[-1]["price"]
+        change = (last - first) / first * 100
+        direction = "rise" if change >= 0 else "fall"
+        opportunities.append(
+            f"{crop['crop'].capitalize()} prices expected to {direction} "
+            f"{abs(change):.0f}% over the next {len(predictions)} weeks"
+        )
+    return opportunities
+
+def _weather_alerts(weather: Dict[str, Any]) -> List[str]:
+    """Turn rainy forecast days from a weather oracle response into alerts"""
+    alerts = []
+    for day in weather.get("forecast") or []:
+        chance = day.get("chance_of_rain") or 0
+        if chance >= RAIN_ALERT_THRESHOLD:
+            alerts.append(f"{day['condition']} expected on {day['date']} ({chance}% chance of rain)")
+    return alerts
+
 @router.get("/oracle/insights")
-async def oracle_insights():
+async def oracle_insights(location: Optional[str] = "auto:ip"):
     """Get unified insights from all oracles"""
     try:
+        # Consult the market and weather oracles concurrently
+        market, weather = await asyncio.gather(
+            asyncio.wait_for(market_oracle(), timeout=INSIGHTS_ORACLE_TIMEOUT),
+            asyncio.wait_for(weather_oracle(location), timeout=INSIGHTS_ORACLE_TIMEOUT),
+            return_exceptions=True
+        )
+        
+        market_opportunities = [
+            "Banana prices expected to rise 15% next month",
+            "High demand for organic vegetables"
+        ]
+        weather_alerts = [
+            "Moderate rainfall expected in 3 days"
+        ]
+        oracles_consulted = 0
+        
+        if isinstance(market, dict) and market.get("status") == "success":
+            oracles_consulted += 1
+            market_opportunities = _market_opportunities(market) or market_opportunities
+        else:
+            logger.warning(f"Market oracle unavailable for insights: {market!r}")
+        
+        if isinstance(weather, dict) and weather.get("status") == "success":
+            oracles_consulted += 1
+            weather_alerts = _weather_alerts(weather)
+        else:
+            logger.warning(f"Weather oracle unavailable for insights: {weather!r}")
+        
         return {
             "oracle_type": "unified_insights",
             "status": "success",
@@ -460,26 +624,20 @@ async def oracle_insights():
                     "Optimal time for wheat planting",
                     "Soil pH adjustment recommended"
                 ],
-                "market_opportunities": [
-                    "Banana prices expected to rise 15% next month",
-                    "High demand for organic vegetables"
-                ],
-                "weather_alerts": [
-                    "Moderate rainfall expected in 3 days"
-                ]
+                "market_opportunities": market_opportunities,
+                "weather_alerts": weather_alerts
             },
             "confidence": 0.80,
             "metadata": {
-                "oracles_consulted": 4,
-                "last_updated": "2025-01-01T00:00:00Z",
+                "oracles_consulted": oracles_consulted,
+                "last_updated": datetime.now(timezone.utc).isoformat(),
                 "recommendation_engine": "Multi-oracle fusion"
             },
             "hackathon": "Africa Blockchain Festival 2025"
         }
         
     except Exception as e:
-        logger.error(f"Oracle insights error: {str(e)}")
-        logger.error(traceback.format_exc())
+        logger.exception("Oracle insights error")
         raise HTTPException(status_code=500, detail=f"Oracle insights failed: {str(e)}")
 
 # Legacy endpoint compatibility
@@ -508,6 +666,5 @@ async def unified_oracle(
             )
             
     except Exception as e:
-        logger.error(f"Unified oracle error: {str(e)}")
-        logger.error(traceback.format_exc())
+        logger.exception("Unified oracle error")
         raise HTTPException(status_code=500, detail=f"Oracle system failed: {str(e)}")
\ No newline at end of file
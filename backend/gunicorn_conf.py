@@ -0,0 +1,50 @@
+"""
+Gunicorn configuration for FarmOracle backend
+Runs the FastAPI app on uvicorn workers so CPU-bound TensorFlow inference
+scales across processes instead of serializing on one event loop.
+
+Usage (from backend/):
+    gunicorn main:app -c gunicorn_conf.py
+"""
+import os
+import multiprocessing
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 10000)}"
+
+# 2 * CPU + 1 by default; WEB_CONCURRENCY overrides it on memory-constrained hosts
+workers = int(os.environ.get("WEB_CONCURRENCY", 2 * multiprocessing.cpu_count() + 1))
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# Each worker builds its own TensorFlow runtime and model singletons after fork;
+# preloading in the master would share TF state across forked processes
+preload_app = False
+
+timeout = 120
+graceful_timeout = 30
+keepalive = 5
+loglevel = "info"
+
+
+# PRELOAD_MODELS=false skips model loading, leaving TensorFlow unimported
+# until a worker serves its first image request
+preload_models = os.environ.get("PRELOAD_MODELS", "true").lower() not in ("0", "false", "no")
+
+
+def post_worker_init(worker):
+    """Load the soil and disease models in each worker before it accepts requests"""
+    if not preload_models:
+        return
+
+    try:
+        from scripts.predict_soil import load_soil_model
+        load_soil_model()
+        worker.log.info("✅ Soil model loaded in worker %s", worker.pid)
+    except Exception as e:
+        worker.log.warning("⚠️ Could not pre-load soil model in worker %s: %s", worker.pid, e)
+
+    try:
+        from scripts.predict_plantdoc import load_model
+        load_model()
+        worker.log.info("✅ Disease model loaded in worker %s", worker.pid)
+    except Exception as e:
+        worker.log.warning("⚠️ Could not pre-load disease model in worker %s: %s", worker.pid, e)
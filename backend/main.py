@@ -252,7 +252,8 @@ async def predict_soil(file: UploadFile = File(...)):
             # Process the image
             image = Image.open(file.file).convert("RGB")
             image = image.resize(IMG_SIZE)
-            image_array = np.expand_dims(np.array(image) / 255.0, axis=0)
+            # Single float32 pass; `/ 255.0` would upcast the uint8 pixels to float64
+            image_array = np.expand_dims(np.multiply(np.asarray(image), np.float32(1.0 / 255.0), dtype=np.float32), axis=0)
             logger.info(f"Processed image shape: {image_array.shape}")
 
             # Make prediction
@@ -1,10 +1,11 @@
 import cv2
 import numpy as np
-import tensorflow as tf
-from tensorflow.keras.preprocessing.image import img_to_array
 import os
 import json
+import copy
 import logging
+import threading
+from cachetools import TTLCache
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -19,10 +20,21 @@ MODEL_PATHS = [
     os.path.join(os.path.dirname(__file__), "..", "models", "best_plantdoc_model.keras")
 ]
 
-# Global variables for lazy loading
+# Multiplying uint8 pixels by a float32 scale in one ufunc pass avoids the
+# float64 temporary that `array / 255.0` would allocate
+PIXEL_SCALE = np.float32(1.0 / 255.0)
+
+# Global variables for lazy loading (TensorFlow is imported with the model)
 _model = None
 _class_names = None
 
+# Prediction cache keyed by perceptual image hash (see predict_soil.py)
+HASH_SIZE = (16, 16)
+PREDICTION_CACHE_SIZE = 2048
+PREDICTION_CACHE_TTL = 600
+_DISEASE_CACHE = TTLCache(maxsize=PREDICTION_CACHE_SIZE, ttl=PREDICTION_CACHE_TTL)
+_DISEASE_CACHE_LOCK = threading.Lock()
+
 def load_model():
     """Load the plant disease model lazily with fallback options"""
     global _model
@@ -33,6 +45,7 @@ def load_model():
             if os.path.exists(model_path):
                 try:
                     logger.info(f"Attempting to load plant disease model from: {model_path}")
+                    import tensorflow as tf
                     _model = tf.keras.models.load_model(model_path)
                     logger.info(f"✅ Plant disease model loaded successfully from: {os.path.basename(model_path)}")
                     return _model
@@ -52,6 +65,18 @@ def load_model():
     
     return _model
 
+def warmup_model():
+    """Load the plant disease model and run one dummy forward pass to build the graph"""
+    try:
+        model = load_model()
+    except FileNotFoundError:
+        # No model file shipped; load errors on an existing file still propagate
+        return False
+    load_class_names()
+    model(np.zeros((1, 224, 224, 3), dtype=np.float32), training=False)
+    logger.info("Plant disease model warmed up")
+    return True
+
 def load_class_names():
     """Load class names from JSON file"""
     global _class_names
@@ -90,6 +115,11 @@ def get_healthy_classes():
         "Peach leaf", "Raspberry leaf", "Soyabean leaf", "Strawberry leaf", "Tomato leaf"
     }
 
+def image_hash(img):
+    """Average hash of an RGB image array: one bit per pixel/channel above the mean"""
+    small = cv2.resize(img, HASH_SIZE, interpolation=cv2.INTER_AREA).astype(np.float32)
+    return np.packbits(small > small.mean()).tobytes()
+
 def predict_disease(image_path):
     try:
         # Load model and class names on first use
@@ -108,21 +138,32 @@ def predict_disease(image_path):
             return {"error": f"Could not load image -> {image_path}"}
 
         img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+
+        cache_key = image_hash(img)
+        with _DISEASE_CACHE_LOCK:
+            cached = _DISEASE_CACHE.get(cache_key)
+        if cached is not None:
+            return copy.deepcopy(cached)
+
         img = cv2.resize(img, (224, 224))  
-        img = img_to_array(img) / 255.0    
-        img = np.expand_dims(img, axis=0)  
-        prediction = model.predict(img)
+        img = np.multiply(img, PIXEL_SCALE, dtype=np.float32)
+        img = np.expand_dims(img, axis=0)
+        # Direct call skips model.predict's per-call tf.data/callback setup
+        prediction = model(img, training=False).numpy()[0]
         predicted_class = class_names[np.argmax(prediction)]
         confidence = float(np.max(prediction))  
 
         
         health_status = "HEALTHY" if predicted_class in healthy_classes else "DISEASED"
 
-        return {
+        result = {
             "class": predicted_class,
             "confidence": round(confidence, 4),
             "status": health_status
         }
+        with _DISEASE_CACHE_LOCK:
+            _DISEASE_CACHE[cache_key] = result
+        return copy.deepcopy(result)
 
     except Exception as e:
         logger.error(f"Plant disease prediction error: {str(e)}")
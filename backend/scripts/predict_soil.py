@@ -1,8 +1,12 @@
-import tensorflow as tf
 import numpy as np
-from PIL import Image
 import os
+import copy
+import queue
+import time
 import logging
+import threading
+from concurrent.futures import Future
+from cachetools import TTLCache
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -12,6 +16,8 @@ logger = logging.getLogger(__name__)
 BASE_DIR = os.path.dirname(__file__)
 MODELS_DIR = os.path.join(BASE_DIR, "..", "models")
 MODEL_PATH = os.path.join(MODELS_DIR, "soil_classifier.keras")
+# INT8 model produced by scripts/quantize_soil_model.py; preferred when present
+TFLITE_MODEL_PATH = os.path.join(MODELS_DIR, "soil_classifier.tflite")
 
 # Image settings
 IMG_SIZE = (180, 180)
@@ -20,8 +26,26 @@ CONFIDENCE_THRESHOLD = 0.60
 # Class names
 CLASS_NAMES = ['Alluvial soil', 'Black Soil', 'Clay soil', 'Red soil']
 
-# Global model cache
+# Global model cache; TensorFlow itself is imported on first use so workers
+# that never serve soil requests don't pay for it
 _soil_model = None
+_soil_infer = None
+_preprocess_fn = None
+
+# Prediction cache keyed by perceptual image hash; re-uploads of the same
+# photo skip inference for PREDICTION_CACHE_TTL seconds
+HASH_SIZE = (16, 16)
+PREDICTION_CACHE_SIZE = 2048
+PREDICTION_CACHE_TTL = 600
+_SOIL_CACHE = TTLCache(maxsize=PREDICTION_CACHE_SIZE, ttl=PREDICTION_CACHE_TTL)
+_SOIL_CACHE_LOCK = threading.Lock()
+# Single-flight map: concurrent requests for the same hash share one prediction
+_SOIL_INFLIGHT = {}
+
+# Micro-batching: concurrent requests arriving within BATCH_WINDOW_SECONDS
+# share a single forward pass of up to BATCH_MAX_SIZE images
+BATCH_MAX_SIZE = 16
+BATCH_WINDOW_SECONDS = 0.01
 
 # Comprehensive Soil Database
 SOIL_INFO = {
@@ -83,87 +107,275 @@ SOIL_INFO = {
     }
 }
 
-def load_and_prepare_image(image_path):
+# Per-class result templates, built once so predictions only fill in scores
+_SOIL_TEMPLATES = {
+    soil_type: {
+        "soil_type": soil_type,
+        "confidence": None,
+        "recommended_crops": info.get("crops", []),
+        "care_instructions": info.get("care", []),
+        "notes": info.get("notes", ""),
+        "ph_range": info.get("ph_range", "N/A"),
+        "texture": info.get("texture", "N/A"),
+        "water_retention": info.get("water_retention", "N/A"),
+        "all_predictions": None
+    }
+    for soil_type, info in ((name, SOIL_INFO.get(name, {})) for name in CLASS_NAMES)
+}
+
+def _get_preprocess():
+    """Build the preprocessing tf.function once, on first use"""
+    global _preprocess_fn
+    if _preprocess_fn is None:
+        import tensorflow as tf
+
+        @tf.function(reduce_retracing=True)
+        def preprocess(raw_bytes):
+            """Decode, resize, normalize and batch an encoded image in a single graph"""
+            img = tf.io.decode_image(raw_bytes, channels=3, expand_animations=False)
+            img = tf.image.resize(img, IMG_SIZE, method="bilinear", antialias=True)
+            return tf.expand_dims(img / 255.0, 0)
+
+        _preprocess_fn = preprocess
+    return _preprocess_fn
+
+
+def image_hash(img_tensor):
+    """Average hash of a preprocessed image: one bit per pixel/channel above the mean"""
+    import tensorflow as tf
+    small = tf.image.resize(img_tensor, HASH_SIZE, method="area").numpy()
+    return np.packbits(small > small.mean()).tobytes()
+
+
+def load_and_prepare_image(image):
+    """Preprocess an encoded image given as raw bytes or as a file path"""
     try:
-        img = Image.open(image_path).convert("RGB")
-        print(f"🖼️ Original image size: {img.size}")
-        img = img.resize(IMG_SIZE)
-        print(f"📏 Resized to: {IMG_SIZE}")
-        img_array = np.array(img) / 255.0
-        print(f"📊 Image array shape after normalization: {img_array.shape}")
-        return np.expand_dims(img_array, axis=0)
+        import tensorflow as tf
+        raw_bytes = tf.constant(image) if isinstance(image, (bytes, bytearray)) else tf.io.read_file(image)
+        img_tensor = _get_preprocess()(raw_bytes)
+        logger.debug("📊 Image tensor shape after normalization: %s", img_tensor.shape)
+        return img_tensor
     except Exception as e:
-        print(f"❌ Failed to process image: {e}")
+        logger.error("❌ Failed to process image: %s", e)
         return None
 
 
+class _TFLiteSoilModel:
+    """Keras-like callable around a TFLite interpreter for the quantized soil model"""
+
+    def __init__(self, model_path):
+        import tensorflow as tf
+        self._interpreter = tf.lite.Interpreter(model_path=model_path, num_threads=os.cpu_count())
+        self._interpreter.allocate_tensors()
+        self._lock = threading.Lock()
+        self._refresh_details()
+
+    def _refresh_details(self):
+        self._input = self._interpreter.get_input_details()[0]
+        self._output = self._interpreter.get_output_details()[0]
+        self.input_shape = (None, *self._input["shape"][1:])
+        self.output_shape = (None, *self._output["shape"][1:])
+
+    def __call__(self, x, training=False):
+        x = np.asarray(x, dtype=np.float32)
+        with self._lock:
+            if tuple(self._input["shape"]) != x.shape:
+                # Resize the batch dimension to match the micro-batch
+                self._interpreter.resize_tensor_input(self._input["index"], x.shape)
+                self._interpreter.allocate_tensors()
+                self._refresh_details()
+            self._interpreter.set_tensor(self._input["index"], x)
+            self._interpreter.invoke()
+            return self._interpreter.get_tensor(self._output["index"])
+
+    def infer(self, x):
+        """Return (class indices, confidences, probabilities) for a batch"""
+        probs = self(x)
+        indices = probs.argmax(axis=1)
+        return indices, probs[np.arange(len(indices)), indices], probs
+
+
+def _keras_infer(model):
+    """Fuse the forward pass with argmax and confidence lookup in one graph"""
+    import tensorflow as tf
+
+    @tf.function(input_signature=[tf.TensorSpec([None, *IMG_SIZE, 3], tf.float32)])
+    def infer(x):
+        probs = model(x, training=False)
+        indices = tf.argmax(probs, axis=1, output_type=tf.int32)
+        return indices, tf.gather(probs, indices, batch_dims=1), probs
+    return infer
+
+
 def load_soil_model():
-    """Load soil model lazily (only once)"""
+    """Load soil model lazily (only once), preferring the INT8 TFLite model"""
     global _soil_model
     if _soil_model is None:
-        print("📦 Loading soil model...")
+        logger.info("📦 Loading soil model...")
+        if os.path.exists(TFLITE_MODEL_PATH):
+            try:
+                _soil_model = _TFLiteSoilModel(TFLITE_MODEL_PATH)
+                logger.info("✅ Quantized soil model loaded successfully.")
+                return _soil_model
+            except Exception as e:
+                logger.warning("⚠️ Error loading quantized soil model, falling back to Keras: %s", e)
+
         if not os.path.exists(MODEL_PATH):
-            print(f"❌ Model not found at {MODEL_PATH}")
+            logger.error("❌ Model not found at %s", MODEL_PATH)
             return None
         
         try:
+            import tensorflow as tf
             _soil_model = tf.keras.models.load_model(MODEL_PATH)
-            print("✅ Soil model loaded successfully.")
+            logger.info("✅ Soil model loaded successfully.")
         except Exception as e:
-            print(f"❌ Error loading soil model: {e}")
+            logger.error("❌ Error loading soil model: %s", e)
             return None
     
     return _soil_model
 
-def predict_soil_type(image_path):
-    print(f"🔍 Predicting soil type for: {image_path}")
+def load_soil_infer():
+    """Return the batched inference function for the loaded soil model"""
+    global _soil_infer
+    if _soil_infer is None:
+        model = load_soil_model()
+        if model is None:
+            return None
+        _soil_infer = model.infer if isinstance(model, _TFLiteSoilModel) else _keras_infer(model)
+    return _soil_infer
 
-    img_tensor = load_and_prepare_image(image_path)
-    if img_tensor is None:
-        print("❌ Image preprocessing failed.")
-        return None
+class _MicroBatcher:
+    """Background worker that stacks pending single-image tensors into one model call"""
+
+    def __init__(self, max_size=BATCH_MAX_SIZE, window=BATCH_WINDOW_SECONDS):
+        self._queue = queue.Queue()
+        self._max_size = max_size
+        self._window = window
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="soil-batcher", daemon=True)
+                self._thread.start()
+
+    def predict(self, img_tensor):
+        """Queue a (1, H, W, 3) tensor and block until its (index, confidence, probabilities) are ready"""
+        self.start()
+        future = Future()
+        self._queue.put((img_tensor, future))
+        return future.result()
+
+    def _collect(self):
+        pending = [self._queue.get()]
+        deadline = time.monotonic() + self._window
+        while len(pending) < self._max_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                pending.append(self._queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+        return pending
+
+    def _run(self):
+        import tensorflow as tf
+        while True:
+            tensors, futures = zip(*self._collect())
+            try:
+                infer = load_soil_infer()
+                if infer is None:
+                    raise RuntimeError("Soil model unavailable")
+                indices, confidences, probs = (np.asarray(t) for t in infer(tf.concat(tensors, axis=0)))
+            except Exception as e:
+                for future in futures:
+                    future.set_exception(e)
+                continue
+            for i, future in enumerate(futures):
+                future.set_result((int(indices[i]), float(confidences[i]), probs[i]))
+
+
+_batcher = _MicroBatcher()
 
+def warmup_soil_model():
+    """Load the soil model and trace preprocessing and inference on a dummy image"""
+    infer = load_soil_infer()
+    if infer is None:
+        return False
+    import tensorflow as tf
+    _get_preprocess()(tf.io.encode_jpeg(tf.zeros((*IMG_SIZE, 3), dtype=tf.uint8)))
+    infer(np.zeros((1, *IMG_SIZE, 3), dtype=np.float32))
+    _batcher.start()
+    logger.info("Soil model warmed up")
+    return True
+
+def _classify(img_tensor):
+    """Run the soil model on a preprocessed tensor and build the result dict"""
     model = load_soil_model()
     if model is None:
-        print("❌ Model loading failed.")
+        logger.error("❌ Model loading failed.")
         return None
 
     try:
-        print(f"🧪 Model input shape: {model.input_shape}")
-        print(f"🧪 Model output shape: {model.output_shape}")
-        print(f"🧪 Image tensor shape: {img_tensor.shape}")
+        logger.debug("🧪 Model input shape: %s, output shape: %s, image tensor shape: %s",
+                     model.input_shape, model.output_shape, img_tensor.shape)
 
-        prediction = model.predict(img_tensor)[0]
-        predicted_index = int(np.argmax(prediction))
-        confidence = float(prediction[predicted_index]) * 100
+        predicted_index, confidence, prediction = _batcher.predict(img_tensor)
+        confidence *= 100
         predicted_class = CLASS_NAMES[predicted_index]
 
-        print(f"✅ Prediction: {predicted_class} ({confidence:.2f}%)")
-        print(f"📊 Raw prediction values: {prediction}")
-        
-        # Get soil information
-        soil_data = SOIL_INFO.get(predicted_class, {})
+        logger.debug("✅ Prediction: %s (%.2f%%), raw values: %s", predicted_class, confidence, prediction)
         
         # Validate confidence
         if confidence < CONFIDENCE_THRESHOLD * 100:
-            logger.warning(f"Low confidence: {confidence:.2f}% < {CONFIDENCE_THRESHOLD*100:.0f}%")
+            logger.warning("Low confidence: %.2f%% < %.0f%%", confidence, CONFIDENCE_THRESHOLD * 100)
         
-        result = {
-            "soil_type": predicted_class,
-            "confidence": confidence / 100,  # Convert to 0-1 range
-            "recommended_crops": soil_data.get("crops", []),
-            "care_instructions": soil_data.get("care", []),
-            "notes": soil_data.get("notes", ""),
-            "ph_range": soil_data.get("ph_range", "N/A"),
-            "texture": soil_data.get("texture", "N/A"),
-            "water_retention": soil_data.get("water_retention", "N/A"),
-            "all_predictions": {soil: float(pred) for soil, pred in zip(CLASS_NAMES, prediction)}
-        }
+        # Fill in the precomputed soil information template
+        result = _SOIL_TEMPLATES[predicted_class].copy()
+        result["confidence"] = confidence / 100  # Convert to 0-1 range
+        result["all_predictions"] = dict(zip(CLASS_NAMES, prediction.tolist()))
         
-        print(f"🎯 Returning result: {result}")
+        logger.debug("🎯 Returning result: %s", result)
         return result
     except Exception as e:
-        print(f"❌ Prediction failed: {e}")
-        import traceback
-        traceback.print_exc()
-        return None
\ No newline at end of file
+        logger.exception("❌ Prediction failed: %s", e)
+        return None
+
+def predict_soil_type(image):
+    """Classify a soil image given as raw encoded bytes (preferred) or a file path"""
+    if isinstance(image, (bytes, bytearray)):
+        logger.debug("🔍 Predicting soil type for %d-byte upload", len(image))
+    else:
+        logger.debug("🔍 Predicting soil type for: %s", image)
+
+    img_tensor = load_and_prepare_image(image)
+    if img_tensor is None:
+        logger.error("❌ Image preprocessing failed.")
+        return None
+
+    # Serve from cache, or join an identical prediction that is already running
+    cache_key = image_hash(img_tensor)
+    flight = None
+    with _SOIL_CACHE_LOCK:
+        cached = _SOIL_CACHE.get(cache_key)
+        inflight = _SOIL_INFLIGHT.get(cache_key) if cached is None else None
+        if cached is None and inflight is None:
+            flight = _SOIL_INFLIGHT[cache_key] = Future()
+    if cached is not None:
+        return copy.deepcopy(cached)
+    if inflight is not None:
+        result = inflight.result()
+        return copy.deepcopy(result) if result is not None else None
+
+    result = None
+    try:
+        result = _classify(img_tensor)
+    finally:
+        with _SOIL_CACHE_LOCK:
+            if result is not None:
+                _SOIL_CACHE[cache_key] = result
+            _SOIL_INFLIGHT.pop(cache_key, None)
+        flight.set_result(result)
+    return copy.deepcopy(result) if result is not None else None
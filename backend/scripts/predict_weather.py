@@ -1,27 +1,237 @@
 import os
-import requests
+import re
+import asyncio
+import httpx
 from datetime import datetime, timedelta
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 import logging
+import operator
+import threading
+from cachetools import TTLCache
+
+try:
+    # simdjson parses lazily: only the ~15 fields per day we read (and four
+    # of the 24 hourly entries) are ever converted to Python objects. Parsers
+    # are not thread-safe and reuse their buffer, so keep one per thread and
+    # finish extracting before the next parse.
+    import simdjson
+    _parser_local = threading.local()
+
+    def _json_loads(content):
+        parser = getattr(_parser_local, "parser", None)
+        if parser is None:
+            parser = _parser_local.parser = simdjson.Parser()
+        return parser.parse(content)
+except ImportError:
+    try:
+        # orjson parses the number-heavy forecast payload several times faster
+        import orjson
+        _json_loads = orjson.loads
+    except ImportError:
+        import json
+        _json_loads = json.loads
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
+# httpx logs every request URL at INFO, and WeatherAPI URLs carry the API key
+logging.getLogger("httpx").setLevel(logging.WARNING)
 
 # Get API key from environment
 WEATHER_API_KEY = os.getenv("WEATHER_API_KEY")
-WEATHER_API_BASE = "http://api.weatherapi.com/v1"
+WEATHER_API_BASE = "https://api.weatherapi.com/v1"
+
+# Transient upstream failures are retried: connection errors by the httpx
+# transport, gateway status codes with exponential backoff in the fetch
+RETRY_TOTAL = 2
+RETRY_BACKOFF = 0.2
+RETRY_STATUSES = frozenset({502, 503, 504})
+
+
+# Forecasts change slowly at the source: successful lookups are cached per
+# (location, days) and shared by the sync and async entry points
+FORECAST_CACHE_TTL = 900
+_FORECAST_CACHE = TTLCache(maxsize=512, ttl=FORECAST_CACHE_TTL)
+_FORECAST_CACHE_LOCK = threading.Lock()
+# Per-key asyncio locks so concurrent async misses share one upstream call
+_FORECAST_FETCH_LOCKS = TTLCache(maxsize=1024, ttl=60)
+
+
+# WeatherAPI serves at most 10 forecast days; names, coordinates and
+# "auto:ip" all fit this character set (apostrophes for names like N'Djamena)
+MAX_FORECAST_DAYS = 10
+_LOCATION_RE = re.compile(r"[\w:.,'\- ]{1,128}")
+
+
+def _validate_request(location: str, days: int) -> Optional[Dict[str, Any]]:
+    """Error response (status_code 400) for input WeatherAPI would reject, so no request is sent"""
+    if not 1 <= days <= MAX_FORECAST_DAYS:
+        return {
+            "status": "error",
+            "status_code": 400,
+            "message": f"days must be 1..{MAX_FORECAST_DAYS}"
+        }
+    if not location or not _LOCATION_RE.fullmatch(location):
+        return {
+            "status": "error",
+            "status_code": 400,
+            "message": "Invalid location"
+        }
+    return None
+
+
+def _cache_key(location: str, days: int):
+    return ((location or "").strip().lower(), days)
+
+
+def _cache_get(key):
+    with _FORECAST_CACHE_LOCK:
+        return _FORECAST_CACHE.get(key)
+
+
+def _cache_put(key, result: Dict[str, Any]):
+    if result.get("status") == "success":
+        with _FORECAST_CACHE_LOCK:
+            _FORECAST_CACHE[key] = result
+
+
+def create_async_session(limit: int = 100) -> httpx.AsyncClient:
+    """Create a pooled HTTP/2 client for get_weather_forecast_async (caller closes it)"""
+    # Concurrent forecast requests multiplex over one HTTP/2 connection
+    transport = httpx.AsyncHTTPTransport(
+        http2=True,
+        retries=RETRY_TOTAL,
+        limits=httpx.Limits(max_connections=limit, max_keepalive_connections=20)
+    )
+    return httpx.AsyncClient(transport=transport, timeout=10)
+
+
+def _redact(text: str) -> str:
+    """Strip the WeatherAPI key from text bound for logs or responses"""
+    return text.replace(WEATHER_API_KEY, "***") if WEATHER_API_KEY else text
+
+
+def _api_error_message(response: httpx.Response) -> str:
+    """Status code and WeatherAPI's own error text for a failed response"""
+    try:
+        return f"HTTP {response.status_code}: {_json_loads(response.content)['error']['message']}"
+    except Exception:
+        return f"HTTP {response.status_code}"
+
+
+def _forecast_params(location: str, days: int) -> Dict[str, Any]:
+    """Query parameters for the WeatherAPI forecast endpoint"""
+    return {
+        "key": WEATHER_API_KEY,
+        "q": location,
+        "days": days,
+        "aqi": "yes"  # Include air quality data
+    }
+
+
+# Field getters for the per-day forecast, built once at import
+_DAY_FIELDS = operator.itemgetter(
+    "avgtemp_c", "maxtemp_c", "mintemp_c", "avghumidity",
+    "maxwind_kph", "totalprecip_mm", "daily_chance_of_rain", "uv"
+)
+_CONDITION_FIELDS = operator.itemgetter("text", "icon")
+_ASTRO_FIELDS = operator.itemgetter("sunrise", "sunset")
+_DETAIL_HOURS = (("morning", 6), ("afternoon", 14), ("evening", 18), ("night", 22))
+_NO_DETAILS = {name: "N/A" for name, _ in _DETAIL_HOURS}
+
+
+def _build_day(day) -> Dict[str, Any]:
+    """Format one forecastday entry"""
+    summary = day["day"]
+    avg_temp, max_temp, min_temp, humidity, wind, precipitation, rain, uv = _DAY_FIELDS(summary)
+    condition, icon = _CONDITION_FIELDS(summary["condition"])
+    sunrise, sunset = _ASTRO_FIELDS(day["astro"])
+    hour = day["hour"]
+    if len(hour) > 22:
+        details = {name: f"{hour[index]['temp_c']:.1f}°C" for name, index in _DETAIL_HOURS}
+    else:
+        details = dict(_NO_DETAILS)
+    return {
+        "date": day["date"],
+        "temperature": avg_temp,
+        "max_temp": max_temp,
+        "min_temp": min_temp,
+        "condition": condition,
+        "condition_icon": icon,
+        "humidity": humidity,
+        "wind_kph": wind,
+        "precipitation_mm": precipitation,
+        "chance_of_rain": rain,
+        "uv_index": uv,
+        "sunrise": sunrise,
+        "sunset": sunset,
+        "details": details
+    }
+
+
+def _format_forecast(data) -> Dict[str, Any]:
+    """Extract the fields FarmOracle uses from a parsed WeatherAPI forecast"""
+    forecast_days = [_build_day(day) for day in data["forecast"]["forecastday"]]
+    location = data["location"]
+    current = data["current"]
+    condition, icon = _CONDITION_FIELDS(current["condition"])
+    
+    return {
+        "status": "success",
+        "location": {
+            "name": location["name"],
+            "region": location["region"],
+            "country": location["country"],
+            "lat": location["lat"],
+            "lon": location["lon"],
+            "timezone": location["tz_id"],
+            "localtime": location["localtime"]
+        },
+        "current": {
+            "temp_c": current["temp_c"],
+            "condition": condition,
+            "condition_icon": icon,
+            "humidity": current["humidity"],
+            "wind_kph": current["wind_kph"],
+            "feels_like": current["feelslike_c"],
+            "uv_index": current["uv"]
+        },
+        "forecast": forecast_days
+    }
+
 
 def get_weather_forecast(location: str = "auto:ip", days: int = 7) -> Dict[str, Any]:
     """
-    Fetch real weather forecast from WeatherAPI.com
+    Fetch real weather forecast from WeatherAPI.com (not for use inside a running event loop)
+    
+    Args:
+        location: City name, coordinates, or 'auto:ip' for automatic detection
+        days: Number of days to forecast (1-10)
+    
+    Returns:
+        Dictionary with weather forecast data
+    """
+    # Blocking wrapper for scripts; the API awaits get_weather_forecast_async
+    return asyncio.run(get_weather_forecast_async(location, days))
+
+
+async def get_weather_forecast_async(location: str = "auto:ip",
+                                     days: int = 7,
+                                     session: Optional[httpx.AsyncClient] = None) -> Dict[str, Any]:
+    """
+    Async variant of get_weather_forecast for use on the event loop
     
     Args:
         location: City name, coordinates, or 'auto:ip' for automatic detection
         days: Number of days to forecast (1-10)
+        session: Shared session from create_async_session(); a temporary one is used if omitted
     
     Returns:
         Dictionary with weather forecast data
     """
+    invalid = _validate_request(location, days)
+    if invalid is not None:
+        return invalid
+    
     if not WEATHER_API_KEY:
         logger.error("WEATHER_API_KEY not found in environment variables")
         return {
@@ -29,84 +239,76 @@ def get_weather_forecast(location: str = "auto:ip", days: int = 7) -> Dict[str,
             "message": "Weather API key not configured"
         }
     
+    key = _cache_key(location, days)
+    cached = _cache_get(key)
+    if cached is not None:
+        return cached
+    
+    lock = _FORECAST_FETCH_LOCKS.get(key)
+    if lock is None:
+        lock = _FORECAST_FETCH_LOCKS[key] = asyncio.Lock()
+    async with lock:
+        cached = _cache_get(key)
+        if cached is not None:
+            return cached
+        
+        if session is None:
+            async with create_async_session() as temp_session:
+                result = await _fetch_forecast_async(location, days, temp_session)
+        else:
+            result = await _fetch_forecast_async(location, days, session)
+        _cache_put(key, result)
+        return result
+
+
+async def _fetch_forecast_async(location: str, days: int, session: httpx.AsyncClient) -> Dict[str, Any]:
+    """Fetch and format one forecast over a shared httpx client, without caching"""
     try:
-        # Fetch forecast data
+        logger.info("Fetching weather for location: %s", location)
         url = f"{WEATHER_API_BASE}/forecast.json"
-        params = {
-            "key": WEATHER_API_KEY,
-            "q": location,
-            "days": min(days, 10),  # API supports max 10 days
-            "aqi": "yes"  # Include air quality data
-        }
-        
-        logger.info(f"Fetching weather for location: {location}")
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
-        
-        data = response.json()
-        
-        # Extract and format forecast data
-        forecast_days = []
-        for day in data["forecast"]["forecastday"]:
-            forecast_days.append({
-                "date": day["date"],
-                "temperature": day["day"]["avgtemp_c"],
-                "max_temp": day["day"]["maxtemp_c"],
-                "min_temp": day["day"]["mintemp_c"],
-                "condition": day["day"]["condition"]["text"],
-                "condition_icon": day["day"]["condition"]["icon"],
-                "humidity": day["day"]["avghumidity"],
-                "wind_kph": day["day"]["maxwind_kph"],
-                "precipitation_mm": day["day"]["totalprecip_mm"],
-                "chance_of_rain": day["day"]["daily_chance_of_rain"],
-                "uv_index": day["day"]["uv"],
-                "sunrise": day["astro"]["sunrise"],
-                "sunset": day["astro"]["sunset"],
-                "details": {
-                    "morning": f"{day['hour'][6]['temp_c']:.1f}°C" if len(day['hour']) > 6 else "N/A",
-                    "afternoon": f"{day['hour'][14]['temp_c']:.1f}°C" if len(day['hour']) > 14 else "N/A",
-                    "evening": f"{day['hour'][18]['temp_c']:.1f}°C" if len(day['hour']) > 18 else "N/A",
-                    "night": f"{day['hour'][22]['temp_c']:.1f}°C" if len(day['hour']) > 22 else "N/A"
-                }
-            })
+        params = _forecast_params(location, days)
+        for attempt in range(RETRY_TOTAL + 1):
+            response = await session.get(url, params=params)
+            if response.status_code not in RETRY_STATUSES or attempt == RETRY_TOTAL:
+                break
+            await asyncio.sleep(RETRY_BACKOFF * 2 ** attempt)
+        if response.is_error:
+            # Not raise_for_status(): its message embeds the URL, key included
+            message = _api_error_message(response)
+            logger.error("Weather API request failed: %s", message)
+            return {
+                "status": "error",
+                "message": f"Failed to fetch weather data: {message}"
+            }
         
-        return {
-            "status": "success",
-            "location": {
-                "name": data["location"]["name"],
-                "region": data["location"]["region"],
-                "country": data["location"]["country"],
-                "lat": data["location"]["lat"],
-                "lon": data["location"]["lon"],
-                "timezone": data["location"]["tz_id"],
-                "localtime": data["location"]["localtime"]
-            },
-            "current": {
-                "temp_c": data["current"]["temp_c"],
-                "condition": data["current"]["condition"]["text"],
-                "condition_icon": data["current"]["condition"]["icon"],
-                "humidity": data["current"]["humidity"],
-                "wind_kph": data["current"]["wind_kph"],
-                "feels_like": data["current"]["feelslike_c"],
-                "uv_index": data["current"]["uv"]
-            },
-            "forecast": forecast_days
-        }
+        return _format_forecast(_json_loads(response.content))
         
-    except requests.exceptions.RequestException as e:
-        logger.error(f"Weather API request failed: {e}")
+    except httpx.HTTPError as e:
+        message = _redact(str(e))
+        logger.error("Weather API request failed: %s", message)
         return {
             "status": "error",
-            "message": f"Failed to fetch weather data: {str(e)}"
+            "message": f"Failed to fetch weather data: {message}"
         }
     except Exception as e:
-        logger.error(f"Weather processing error: {e}")
+        logger.error("Weather processing error: %s", e)
         return {
             "status": "error",
             "message": f"Error processing weather data: {str(e)}"
         }
 
 
+async def get_weather_forecasts_async(locations: List[str],
+                                      days: int = 7,
+                                      session: Optional[httpx.AsyncClient] = None) -> Dict[str, Dict[str, Any]]:
+    """Fetch forecasts for several locations concurrently over one connection pool"""
+    if session is None:
+        async with create_async_session() as temp_session:
+            return await get_weather_forecasts_async(locations, days, temp_session)
+    
+    results = await asyncio.gather(*(get_weather_forecast_async(loc, days, session) for loc in locations))
+    return dict(zip(locations, results))
+
 if __name__ == "__main__":
     # Test the function
     result = get_weather_forecast("New Delhi")
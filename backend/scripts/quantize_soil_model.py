@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Soil Model INT8 Quantizer
+Converts models/soil_classifier.keras into an INT8 TensorFlow Lite model
+(models/soil_classifier.tflite) that predict_soil.py picks up automatically.
+
+Usage:
+    python scripts/quantize_soil_model.py [calibration_image_dir] [max_images]
+"""
+
+import os
+import sys
+import logging
+import tensorflow as tf
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(__file__)
+MODELS_DIR = os.path.join(BASE_DIR, "..", "models")
+KERAS_MODEL_PATH = os.path.join(MODELS_DIR, "soil_classifier.keras")
+TFLITE_MODEL_PATH = os.path.join(MODELS_DIR, "soil_classifier.tflite")
+CALIBRATION_DIR = os.path.join(BASE_DIR, "..", "Soil", "Train")
+ALLOWED_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp"}
+
+
+def find_calibration_images(image_dir, max_images=200):
+    """Collect up to max_images image paths spread across the class folders"""
+    paths = []
+    for root, _, files in os.walk(image_dir):
+        for file in sorted(files):
+            if os.path.splitext(file)[1].lower() in ALLOWED_EXTENSIONS:
+                paths.append(os.path.join(root, file))
+    step = max(1, len(paths) // max_images)
+    return paths[::step][:max_images]
+
+
+def representative_dataset(image_paths, img_size):
+    """Yield preprocessed images exactly as predict_soil.py feeds them to the model"""
+    def generator():
+        for path in image_paths:
+            img = tf.io.decode_image(tf.io.read_file(path), channels=3, expand_animations=False)
+            img = tf.image.resize(img, img_size, method="bilinear", antialias=True)
+            yield [tf.expand_dims(img / 255.0, 0)]
+    return generator
+
+
+def quantize_soil_model(image_dir=CALIBRATION_DIR, max_images=200):
+    """Post-training INT8 quantization; input and output stay float32"""
+    model = tf.keras.models.load_model(KERAS_MODEL_PATH)
+    img_size = tuple(model.input_shape[1:3])
+
+    image_paths = find_calibration_images(image_dir, max_images)
+    if not image_paths:
+        raise FileNotFoundError(f"No calibration images found in {image_dir}")
+    logger.info(f"📊 Calibrating with {len(image_paths)} images at {img_size}")
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    converter.representative_dataset = representative_dataset(image_paths, img_size)
+    converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+
+    tflite_model = converter.convert()
+    with open(TFLITE_MODEL_PATH, 'wb') as f:
+        f.write(tflite_model)
+
+    size_mb = len(tflite_model) / (1024 * 1024)
+    logger.info(f"✅ INT8 soil model saved: {TFLITE_MODEL_PATH} ({size_mb:.2f} MB)")
+    return TFLITE_MODEL_PATH
+
+
+if __name__ == "__main__":
+    image_dir = sys.argv[1] if len(sys.argv) > 1 else CALIBRATION_DIR
+    max_images = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    quantize_soil_model(image_dir, max_images)
@@ -4,10 +4,18 @@ Provides AI-powered insights and recommendations for FarmOracle
 """
 
 import os
+import re
+import asyncio
+import io
+import hashlib
 import logging
-from typing import Dict, Any, Optional
-import google.generativeai as genai
+import threading
+from functools import cached_property
+from typing import Dict, Any, Optional, AsyncIterator
 from dotenv import load_dotenv
+import numpy as np
+from PIL import Image
+from cachetools import LRUCache, TTLCache
 
 # Load environment variables
 load_dotenv()
@@ -15,26 +23,236 @@ load_dotenv()
 # Configure logging
 logger = logging.getLogger(__name__)
 
-# Configure Gemini
+# Gemini is configured on first use, not at import, to keep worker start-up fast
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-if GEMINI_API_KEY:
-    genai.configure(api_key=GEMINI_API_KEY)
-    logger.info("✅ Gemini API configured successfully")
-else:
-    logger.warning("⚠️ GEMINI_API_KEY not found in environment variables")
+
+# Maximum concurrent Gemini requests per process; size to the API quota
+GEMINI_CONCURRENCY = int(os.getenv("GEMINI_CONCURRENCY", "8"))
+
+# Text responses keyed by a hash of the normalized prompt, so repeated advice
+# and report requests skip the Gemini round trip
+PROMPT_CACHE_SIZE = 2048
+PROMPT_CACHE_TTL = 24 * 3600
+_PROMPT_CACHE = TTLCache(maxsize=PROMPT_CACHE_SIZE, ttl=PROMPT_CACHE_TTL)
+
+# Market insights advise when to sell, so they expire on the same hourly
+# schedule as the controller's price predictions (PRICE_CACHE_TTL)
+MARKET_CACHE_TTL = 3600
+_MARKET_CACHE = TTLCache(maxsize=256, ttl=MARKET_CACHE_TTL)
+_WHITESPACE = re.compile(r"\s+")
+
+# Inline image parts keyed by (path, mtime, size): validating and then
+# analyzing the same upload reads and re-encodes it once
+IMAGE_CACHE_SIZE = 32
+_IMAGE_PARTS = LRUCache(maxsize=IMAGE_CACHE_SIZE)
+
+# Prompt templates built once at import; optional context lines are filled
+# in per request instead of re-concatenating the whole prompt
+_ADVICE_TEMPLATE = """You are an expert agricultural advisor for African farmers.
+
+Crop Information:
+- Crop Type: {crop_type}
+{disease_line}{soil_line}{weather_line}
+Please provide:
+1. Immediate actions the farmer should take
+2. Treatment recommendations (if disease detected)
+3. Best practices for this crop
+4. Expected timeline for recovery/growth
+5. Cost-effective solutions suitable for African farmers
+
+Keep advice practical, affordable, and specific to African farming conditions.
+"""
+
+_REPORT_TEMPLATE = """You are an expert agricultural consultant. A farmer's plant has been diagnosed with: %(disease)s
+
+Search your knowledge about "%(disease)s" and provide a detailed, accurate report.
+
+Format your response EXACTLY like this:
+
+**What We Found:**
+Explain what %(disease)s is, what causes it, and how it affects the plant. Be specific about symptoms.
+
+**How Serious Is It:**
+Rate the severity (Low/Medium/High concern) and explain the potential impact if left untreated.
+
+**What To Do Now - Immediate Actions:**
+1. [First specific action for %(disease)s]
+2. [Second specific action for %(disease)s]
+3. [Third specific action for %(disease)s]
+4. [Fourth specific action for %(disease)s]
+5. [Fifth specific action for %(disease)s]
+
+**Treatment Options:**
+List specific treatments, fungicides, or remedies that work for %(disease)s. Include both organic and chemical options with product names if possible.
+
+**Prevention Tips:**
+Specific prevention methods for %(disease)s - what conditions to avoid, resistant varieties, etc.
+
+**Recovery Timeline:**
+How long recovery takes with proper treatment for %(disease)s.
+
+Be specific to %(disease)s. Do NOT give generic advice. Research this disease and provide accurate, actionable information."""
+
+# Gemini vision gains nothing above ~1024px, so uploads are downscaled and
+# recompressed before sending
+VISION_MAX_SIZE = (1024, 1024)
+VISION_JPEG_QUALITY = 80
+
+def _prep_image(image_path: str) -> bytes:
+    """Downscale an image to VISION_MAX_SIZE and re-encode it as JPEG"""
+    try:
+        with Image.open(image_path) as img:
+            img = img.convert("RGB")
+            img.thumbnail(VISION_MAX_SIZE, Image.Resampling.LANCZOS)
+            buf = io.BytesIO()
+            img.save(buf, "JPEG", quality=VISION_JPEG_QUALITY, optimize=True)
+        return buf.getvalue()
+    except OSError:
+        # Formats Pillow cannot decode (e.g. HEIC) are sent to Gemini as uploaded
+        with open(image_path, 'rb') as img_file:
+            return img_file.read()
+
+# Local colour screen run before the Gemini plant check. It only ever accepts:
+# photos where green foliage fills most of the frame skip the network call,
+# everything else goes to Gemini. The hue band starts at ~70 degrees and green
+# must be the dominant channel, so yellow, khaki, sand and straw tones (soil
+# photos included) never pass. The remaining false-accept risk is a large
+# green non-plant object; no image is ever rejected without Gemini.
+SCREEN_SIZE = (64, 64)
+FOLIAGE_HUE = (50, 113)  # ~70-160 degrees on PIL's 0-255 hue scale
+FOLIAGE_ACCEPT_FRACTION = 0.5
+
+def _local_plant_check(image_path: str) -> Optional[bool]:
+    """True when the colour screen is confident it is a plant, None when Gemini should decide"""
+    try:
+        with Image.open(image_path) as img:
+            img.draft("RGB", SCREEN_SIZE)
+            img = img.convert("RGB")
+            img.thumbnail(SCREEN_SIZE)
+            rgb = np.asarray(img, dtype=np.int16)
+            hsv = np.asarray(img.convert("HSV"))
+    except OSError:
+        return None
+    red, green, blue = rgb[..., 0], rgb[..., 1], rgb[..., 2]
+    hue, sat, val = hsv[..., 0], hsv[..., 1], hsv[..., 2]
+    foliage = (
+        (sat > 50) & (val > 40)
+        & (hue >= FOLIAGE_HUE[0]) & (hue <= FOLIAGE_HUE[1])
+        & (green > red) & (green > blue)
+    )
+    if foliage.mean() >= FOLIAGE_ACCEPT_FRACTION:
+        return True
+    return None
+
+def _prompt_key(prompt: str) -> bytes:
+    """Hash a prompt after collapsing whitespace and case"""
+    normalized = _WHITESPACE.sub(" ", prompt).strip().lower()
+    return hashlib.blake2b(normalized.encode("utf-8"), digest_size=16).digest()
+
+def _log_prompt(prompt: str):
+    """Log outgoing prompts at DEBUG only; they run to several KB"""
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Gemini prompt (%d chars): %s", len(prompt), prompt)
 
 class GeminiService:
     """Service for interacting with Google Gemini AI"""
     
     def __init__(self):
-        self.model = None
-        if GEMINI_API_KEY:
+        self._init_lock = threading.Lock()
+        # Caps in-flight Gemini requests per process to stay under the API quota
+        self._sem = asyncio.Semaphore(GEMINI_CONCURRENCY)
+    
+    @cached_property
+    def model(self):
+        """Gemini model, configured once on first access; None without an API key"""
+        with self._init_lock:
+            if "model" in self.__dict__:
+                return self.__dict__["model"]
+            if not GEMINI_API_KEY:
+                logger.warning("⚠️ GEMINI_API_KEY not found in environment variables")
+                return None
             try:
-                # Use Gemini 2.5 Flash (stable multimodal model)
-                self.model = genai.GenerativeModel('models/gemini-2.5-flash')
+                import google.generativeai as genai
+                genai.configure(api_key=GEMINI_API_KEY)
+                # Use Gemini 2.5 Flash (stable multimodal model, also used for vision)
+                model = genai.GenerativeModel('models/gemini-2.5-flash')
                 logger.info("✅ Gemini model initialized")
+                return model
             except Exception as e:
-                logger.error(f"❌ Failed to initialize Gemini model: {e}")
+                logger.error("❌ Failed to initialize Gemini model: %s", e)
+                return None
+    
+    async def _generate_content(self, contents):
+        """Call Gemini without blocking the event loop"""
+        generate_async = getattr(self.model, "generate_content_async", None)
+        async with self._sem:
+            if generate_async is not None:
+                return await generate_async(contents)
+            return await asyncio.to_thread(self.model.generate_content, contents)
+    
+    async def _generate_text(self, prompt: str, cache: TTLCache = _PROMPT_CACHE) -> str:
+        """Generate text for a prompt, reusing cached responses"""
+        key = _prompt_key(prompt)
+        text = cache.get(key)
+        if text is None:
+            _log_prompt(prompt)
+            text = (await self._generate_content(prompt)).text
+            cache[key] = text
+        return text
+    
+    async def _stream_text(self, prompt: str) -> AsyncIterator[str]:
+        """Yield response text as Gemini produces it, caching the completed text"""
+        key = _prompt_key(prompt)
+        text = _PROMPT_CACHE.get(key)
+        if text is not None:
+            yield text
+            return
+        _log_prompt(prompt)
+        generate_async = getattr(self.model, "generate_content_async", None)
+        if generate_async is None:
+            text = (await self._generate_content(prompt)).text
+            _PROMPT_CACHE[key] = text
+            yield text
+            return
+        # A background task drains the upstream stream into a queue, so the
+        # semaphore slot is held only while Gemini is producing, never while
+        # waiting on a slow HTTP client
+        queue = asyncio.Queue()
+        
+        async def pump():
+            chunks = []
+            try:
+                async with self._sem:
+                    async for chunk in await generate_async(prompt, stream=True):
+                        chunks.append(chunk.text)
+                        queue.put_nowait(chunk.text)
+                # Only complete responses are cached, never partial reports
+                _PROMPT_CACHE[key] = "".join(chunks)
+            finally:
+                queue.put_nowait(None)
+        
+        task = asyncio.ensure_future(pump())
+        try:
+            while (text := await queue.get()) is not None:
+                yield text
+            # Re-raise an upstream failure to the consumer
+            await task
+        finally:
+            if not task.done():
+                # Consumer went away: stop pulling from Gemini
+                task.cancel()
+    
+    async def _image_part(self, image_path: str) -> Dict[str, Any]:
+        """Inline image part for a vision prompt, cached per file version"""
+        # Disk reads and the PIL re-encode run off the event loop
+        stat = await asyncio.to_thread(os.stat, image_path)
+        key = (image_path, stat.st_mtime_ns, stat.st_size)
+        part = _IMAGE_PARTS.get(key)
+        if part is None:
+            data = await asyncio.to_thread(_prep_image, image_path)
+            part = {"mime_type": "image/jpeg", "data": data}
+            _IMAGE_PARTS[key] = part
+        return part
     
     async def get_farming_advice(self, 
                                  crop_type: str, 
@@ -61,35 +279,19 @@ class GeminiService:
         
         try:
             # Build context-aware prompt
-            prompt = f"""You are an expert agricultural advisor for African farmers. 
-            
-Crop Information:
-- Crop Type: {crop_type}
-"""
-            if disease:
-                prompt += f"- Disease Detected: {disease}\n"
-            if soil_type:
-                prompt += f"- Soil Type: {soil_type}\n"
-            if weather:
-                prompt += f"- Weather Conditions: {weather}\n"
-            
-            prompt += """
-Please provide:
-1. Immediate actions the farmer should take
-2. Treatment recommendations (if disease detected)
-3. Best practices for this crop
-4. Expected timeline for recovery/growth
-5. Cost-effective solutions suitable for African farmers
-
-Keep advice practical, affordable, and specific to African farming conditions.
-"""
+            prompt = _ADVICE_TEMPLATE.format_map({
+                "crop_type": crop_type,
+                "disease_line": f"- Disease Detected: {disease}\n" if disease else "",
+                "soil_line": f"- Soil Type: {soil_type}\n" if soil_type else "",
+                "weather_line": f"- Weather Conditions: {weather}\n" if weather else "",
+            })
             
             # Generate response
-            response = self.model.generate_content(prompt)
+            advice = await self._generate_text(prompt)
             
             return {
                 "status": "success",
-                "advice": response.text,
+                "advice": advice,
                 "crop_type": crop_type,
                 "context": {
                     "disease": disease,
@@ -99,7 +301,7 @@ Keep advice practical, affordable, and specific to African farming conditions.
             }
             
         except Exception as e:
-            logger.error(f"Gemini API error: {e}")
+            logger.error("Gemini API error: %s", e)
             return {
                 "status": "error",
                 "message": str(e)
@@ -123,23 +325,9 @@ Keep advice practical, affordable, and specific to African farming conditions.
             }
         
         try:
-            vision_model = genai.GenerativeModel('models/gemini-2.5-flash')
-            
-            with open(image_path, 'rb') as img_file:
-                image_data = img_file.read()
-            
-            prompt = """Analyze this image and determine if it shows a plant, crop, vegetable, fruit, leaf, or any agricultural/botanical subject.
-
-Respond with ONLY ONE WORD:
-- "YES" if the image shows any plant, crop, vegetable, fruit, leaf, tree, or agricultural subject
-- "NO" if the image shows anything else (person, animal, object, building, etc.)
-
-Your response:"""
-            
-            response = vision_model.generate_content([prompt, {"mime_type": "image/jpeg", "data": image_data}])
-            answer = response.text.strip().upper()
-            
-            is_plant = "YES" in answer
+            is_plant = await asyncio.to_thread(_local_plant_check, image_path)
+            if is_plant is None:
+                is_plant = await self._ask_is_plant(image_path)
             
             return {
                 "status": "success",
@@ -148,13 +336,30 @@ Your response:"""
             }
             
         except Exception as e:
-            logger.error(f"Gemini validation error: {e}")
+            logger.error("Gemini validation error: %s", e)
             return {
                 "status": "error",
                 "message": str(e),
                 "is_plant": False  # Reject by default on error - safer for production
             }
     
+    async def _ask_is_plant(self, image_path: str) -> bool:
+        """Ask Gemini whether the image shows a plant"""
+        image_part = await self._image_part(image_path)
+        
+        prompt = """Analyze this image and determine if it shows a plant, crop, vegetable, fruit, leaf, or any agricultural/botanical subject.
+
+Respond with ONLY ONE WORD:
+- "YES" if the image shows any plant, crop, vegetable, fruit, leaf, tree, or agricultural subject
+- "NO" if the image shows anything else (person, animal, object, building, etc.)
+
+Your response:"""
+        
+        response = await self._generate_content([prompt, image_part])
+        # Match the first word exactly so answers like "NO, ..." or "YESTERDAY" don't pass
+        tokens = response.text.upper().split()
+        return bool(tokens) and tokens[0].strip('".,!') == "YES"
+    
     async def generate_user_friendly_report(self, 
                                            disease_name: str, 
                                            confidence: float,
@@ -177,52 +382,38 @@ Your response:"""
             }
         
         try:
-            prompt = f"""You are an expert agricultural consultant. A farmer's plant has been diagnosed with: {disease_name}
-
-Search your knowledge about "{disease_name}" and provide a detailed, accurate report.
-
-Format your response EXACTLY like this:
-
-**What We Found:**
-Explain what {disease_name} is, what causes it, and how it affects the plant. Be specific about symptoms.
-
-**How Serious Is It:**
-Rate the severity (Low/Medium/High concern) and explain the potential impact if left untreated.
-
-**What To Do Now - Immediate Actions:**
-1. [First specific action for {disease_name}]
-2. [Second specific action for {disease_name}]
-3. [Third specific action for {disease_name}]
-4. [Fourth specific action for {disease_name}]
-5. [Fifth specific action for {disease_name}]
-
-**Treatment Options:**
-List specific treatments, fungicides, or remedies that work for {disease_name}. Include both organic and chemical options with product names if possible.
-
-**Prevention Tips:**
-Specific prevention methods for {disease_name} - what conditions to avoid, resistant varieties, etc.
-
-**Recovery Timeline:**
-How long recovery takes with proper treatment for {disease_name}.
-
-Be specific to {disease_name}. Do NOT give generic advice. Research this disease and provide accurate, actionable information."""
-            
-            response = self.model.generate_content(prompt)
+            report = "".join([chunk async for chunk in self.stream_user_friendly_report(disease_name)])
             
             return {
                 "status": "success",
-                "report": response.text,
+                "report": report,
                 "disease": disease_name,
                 "confidence": confidence
             }
             
         except Exception as e:
-            logger.error(f"Gemini report generation error: {e}")
+            logger.error("Gemini report generation error: %s", e)
             return {
                 "status": "error",
                 "message": str(e)
             }
     
+    async def stream_user_friendly_report(self, disease_name: str) -> AsyncIterator[str]:
+        """
+        Stream the disease report text chunk by chunk as Gemini generates it
+        
+        Args:
+            disease_name: Detected disease name from ML model
+            
+        Yields:
+            Report text fragments, suitable for a FastAPI StreamingResponse
+        """
+        if not self.model:
+            raise RuntimeError("Gemini API not configured")
+        
+        async for chunk in self._stream_text(_REPORT_TEMPLATE % {"disease": disease_name}):
+            yield chunk
+    
     async def analyze_crop_image(self, image_path: str, crop_type: str) -> Dict[str, Any]:
         """
         Analyze crop image using Gemini Vision
@@ -241,12 +432,7 @@ Be specific to {disease_name}. Do NOT give generic advice. Research this disease
             }
         
         try:
-            # Use Gemini 2.5 Flash for image analysis (supports vision)
-            vision_model = genai.GenerativeModel('models/gemini-2.5-flash')
-            
-            # Upload image
-            with open(image_path, 'rb') as img_file:
-                image_data = img_file.read()
+            image_part = await self._image_part(image_path)
             
             prompt = f"""Analyze this {crop_type} crop image and provide:
 1. Overall health assessment
@@ -257,7 +443,7 @@ Be specific to {disease_name}. Do NOT give generic advice. Research this disease
 
 Focus on practical advice for African farmers."""
             
-            response = vision_model.generate_content([prompt, {"mime_type": "image/jpeg", "data": image_data}])
+            response = await self._generate_content([prompt, image_part])
             
             return {
                 "status": "success",
@@ -266,7 +452,7 @@ Focus on practical advice for African farmers."""
             }
             
         except Exception as e:
-            logger.error(f"Gemini Vision error: {e}")
+            logger.error("Gemini Vision error: %s", e)
             return {
                 "status": "error",
                 "message": str(e)
@@ -304,21 +490,56 @@ Provide:
 
 Keep advice practical for African farmers."""
             
-            response = self.model.generate_content(prompt)
+            insights = await self._generate_text(prompt, cache=_MARKET_CACHE)
             
             return {
                 "status": "success",
-                "insights": response.text,
+                "insights": insights,
                 "crop_type": crop_type,
                 "current_price": current_price
             }
             
         except Exception as e:
-            logger.error(f"Gemini API error: {e}")
+            logger.error("Gemini API error: %s", e)
             return {
                 "status": "error",
                 "message": str(e)
             }
+    
+    async def bundle(self,
+                     crop_type: str,
+                     disease: Optional[str] = None,
+                     confidence: float = 0.0,
+                     soil_type: Optional[str] = None,
+                     weather: Optional[str] = None,
+                     current_price: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Run advice, disease report and market insights concurrently
+        
+        Args:
+            crop_type: Type of crop
+            disease: Detected disease; the report is skipped without one
+            confidence: Disease detection confidence (0-1)
+            soil_type: Soil classification
+            weather: Weather conditions
+            current_price: Current market price; insights are skipped without one
+            
+        Returns:
+            Dictionary with the advice, report and market results (None when skipped)
+        """
+        async def skipped():
+            return None
+        
+        advice, report, market = await asyncio.gather(
+            self.get_farming_advice(crop_type, disease, soil_type, weather),
+            self.generate_user_friendly_report(disease, confidence, crop_type) if disease else skipped(),
+            self.get_market_insights(crop_type, current_price) if current_price is not None else skipped()
+        )
+        return {
+            "advice": advice,
+            "report": report,
+            "market": market
+        }
 
 # Global instance
 gemini_service = GeminiService()